@@ -15,7 +15,8 @@ import argparse
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
-from PIL import Image, ImageSequence
+import numpy as np
+from PIL import GifImagePlugin, Image
 
 
 def _durations_ms(im: Image.Image) -> List[int]:
@@ -24,9 +25,12 @@ def _durations_ms(im: Image.Image) -> List[int]:
     If a duration is missing/invalid, defaults to 33ms (~30fps).
     """
     durs: List[int] = []
-    for frame in ImageSequence.Iterator(im):
-        # Pillow stores GIF frame duration in frame.info["duration"] (ms)
-        dur = frame.info.get("duration", im.info.get("duration", 33))
+    for i in range(getattr(im, "n_frames", 1)):
+        # seek() parses the frame header only; pixel data is decoded lazily
+        # on access, which never happens here. Pillow stores the GIF frame
+        # duration in im.info["duration"] (ms) after each seek.
+        im.seek(i)
+        dur = im.info.get("duration", 33)
         try:
             dur_int = int(dur)
         except Exception:
@@ -37,9 +41,63 @@ def _durations_ms(im: Image.Image) -> List[int]:
     return durs
 
 
-def _extract_frames_rgba(im: Image.Image) -> List[Image.Image]:
+def _uses_global_palette(im: Image.Image) -> bool:
+    """
+    True when the first frame's palette is exactly the file's global color
+    table. Pillow's P-mode loading strategy carries the *current* palette
+    forward for frames without a local table, but GIF semantics say those
+    frames use the global table — so a differing local table on frame 0
+    (ffmpeg's palettegen emits one) would silently recolor every later frame.
+    """
+    im.load()
+    global_palette = getattr(im, "global_palette", None)
+    if global_palette is None or im.palette is None:
+        return False
+    return bytes(im.palette.palette) == bytes(global_palette.palette)
+
+
+def _extract_frames(im: Image.Image, indices: List[int]) -> List[Image.Image]:
+    """
+    Decode only the frames selected by `indices` (ascending).
+
+    Skipped frames are seeked past without the per-frame convert/copy, which
+    is most of the win when downsampling (e.g. 30->12fps keeps ~40%).
+
+    A well-formed GIF keeps one palette across frames; in that case keep the
+    copies in "P" mode — half the memory of an RGBA intermediate while the
+    sequence is held, converting per frame only when a consumer needs RGBA.
+    Fall back to RGBA when per-frame palettes differ or the source is not
+    palettized.
+    """
+    # The caller has typically just walked the file for durations, leaving it
+    # positioned at the last frame — where Pillow's default loading strategy
+    # reports a composited RGB/RGBA mode. Rewind before sniffing the source.
+    im.seek(0)
+    if im.mode == "P" and _uses_global_palette(im):
+        # By default Pillow composites every GIF frame after the first to
+        # RGB. This strategy keeps frames palettized for as long as the
+        # palette is unchanged; a palette switch yields a non-P frame below,
+        # which sends us down the RGBA fallback.
+        old_strategy = GifImagePlugin.LOADING_STRATEGY
+        GifImagePlugin.LOADING_STRATEGY = GifImagePlugin.LoadingStrategy.RGB_AFTER_DIFFERENT_PALETTE_ONLY
+        try:
+            frames: List[Image.Image] = []
+            for i in indices:
+                im.seek(i)
+                if im.mode != "P":
+                    break
+                frames.append(im.copy())
+            else:
+                return frames
+        finally:
+            GifImagePlugin.LOADING_STRATEGY = old_strategy
+
     # Convert to RGBA so we preserve transparency if present.
-    return [frame.convert("RGBA") for frame in ImageSequence.Iterator(im)]
+    out: List[Image.Image] = []
+    for i in indices:
+        im.seek(i)
+        out.append(im.convert("RGBA"))
+    return out
 
 
 def _sample_indices_by_time(durations_ms: List[int], *, dst_fps: float) -> List[int]:
@@ -50,72 +108,96 @@ def _sample_indices_by_time(durations_ms: List[int], *, dst_fps: float) -> List[
     if dst_fps <= 0:
         raise ValueError("dst_fps must be > 0")
 
-    total_ms = sum(durations_ms)
+    # Cumulative end-times; searchsorted(side="right") gives, for each sample
+    # time t, the first frame whose end-time exceeds t — the frame covering t.
+    ends = np.cumsum(np.asarray(durations_ms, dtype=np.int64))
+    total_ms = int(ends[-1]) if ends.size else 0
     if total_ms <= 0:
         return [0]
 
     step_ms = 1000.0 / dst_fps
+    times = np.arange(0.0, total_ms, step_ms)
+    indices = np.searchsorted(ends, times, side="right")
+    indices = indices[indices < len(durations_ms)]
 
-    # Build cumulative end-times for quick selection.
-    ends: List[int] = []
-    acc = 0
-    for d in durations_ms:
-        acc += d
-        ends.append(acc)
-
-    out: List[int] = []
-    t = 0.0
-    i = 0
-    n = len(durations_ms)
-    while t < total_ms and i < n:
-        # Advance i until frame i covers time t (i.e., ends[i] > t)
-        while i < n and ends[i] <= t:
-            i += 1
-        if i >= n:
-            break
-        out.append(i)
-        t += step_ms
-
-    if not out:
-        out = [0]
+    if indices.size == 0:
+        return [0]
 
     # Deduplicate consecutive duplicates (can happen if dst_fps > effective src fps)
-    dedup: List[int] = [out[0]]
-    for idx in out[1:]:
-        if idx != dedup[-1]:
-            dedup.append(idx)
-    return dedup
+    keep = np.r_[True, np.diff(indices) != 0]
+    return indices[keep].tolist()
 
 
-def convert_gif_fps(input_path: Path, output_path: Path, *, dst_fps: float) -> Tuple[int, int]:
+def convert_gif_fps(input_path: Path, output_path: Path, *, dst_fps: float, fmt: str = "gif") -> Tuple[int, int]:
+    """
+    Resample `input_path` to `dst_fps` and write it as `fmt`:
+    "gif" (default), "webp" (libwebp animation, typically 5-10x smaller)
+    or "apng" (PNG animation, lossless).
+    """
     with Image.open(input_path) as im:
-        frames = _extract_frames_rgba(im)
+        # Durations come from frame metadata only, so the sampling plan is
+        # computed before any pixels are decoded; _extract_frames then
+        # decodes just the frames we keep.
         durs = _durations_ms(im)
-
-    if len(frames) != len(durs):
-        # Extremely defensive; should not happen.
-        n = min(len(frames), len(durs))
-        frames = frames[:n]
-        durs = durs[:n]
-
-    indices = _sample_indices_by_time(durs, dst_fps=dst_fps)
-    out_frames = [frames[i] for i in indices]
+        indices = _sample_indices_by_time(durs, dst_fps=dst_fps)
+        out_frames = _extract_frames(im, indices)
+        n_src = len(durs)
 
     # Set constant duration for output to match dst fps.
     out_duration_ms = max(1, int(round(1000.0 / dst_fps)))
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "gif":
+        # Hand the writer RGBA, one frame at a time. The writer stores P
+        # input as full 256-color frames (measured 2.6x larger than the
+        # per-frame adaptive quantize it applies to RGBA input on
+        # assets/00045.gif), so P-mode extraction is kept purely as a memory
+        # win while the sequence is held. Transparency rides along in the
+        # alpha channel, from which the writer re-derives an index.
+        first = out_frames[0].convert("RGBA")
+        rest = (f.convert("RGBA") for f in out_frames[1:])
+
+        first.save(
+            output_path,
+            save_all=True,
+            append_images=rest,
+            loop=0,
+            duration=out_duration_ms,
+            optimize=True,
+            disposal=2,
+        )
+        return (n_src, len(out_frames))
+
+    # webp/apng are true-color formats; no 256-color quantization needed.
+    out_frames = [f.convert("RGBA") for f in out_frames]
     first, rest = out_frames[0], out_frames[1:]
-    first.save(
-        output_path,
-        save_all=True,
-        append_images=rest,
-        loop=0,
-        duration=out_duration_ms,
-        optimize=True,
-        disposal=2,
-    )
-    return (len(frames), len(out_frames))
+    if fmt == "webp":
+        # libwebp parallelizes encoding natively; method=6 is the strongest
+        # (slowest) compression effort.
+        first.save(
+            output_path,
+            format="WEBP",
+            save_all=True,
+            append_images=rest,
+            loop=0,
+            duration=out_duration_ms,
+            lossless=False,
+            quality=80,
+            method=6,
+        )
+    elif fmt == "apng":
+        first.save(
+            output_path,
+            format="PNG",
+            save_all=True,
+            append_images=rest,
+            loop=0,
+            duration=out_duration_ms,
+        )
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return (n_src, len(out_frames))
 
 
 def main(argv: Iterable[str]) -> int:
@@ -126,7 +208,13 @@ def main(argv: Iterable[str]) -> int:
         "--output",
         type=Path,
         default=None,
-        help="Output GIF path (default: <input>_<dst-fps>fps.gif next to input).",
+        help="Output path (default: <input>_<dst-fps>fps.<ext> next to input).",
+    )
+    p.add_argument(
+        "--format",
+        choices=["gif", "webp", "apng"],
+        default="gif",
+        help="Output format; webp/apng are typically much smaller than GIF for web assets (default: gif).",
     )
     args = p.parse_args(list(argv))
 
@@ -134,11 +222,13 @@ def main(argv: Iterable[str]) -> int:
         raise SystemExit("--dst-fps must be > 0")
 
     if args.output is None:
-        out = args.input.with_name(f"{args.input.stem}_{int(args.dst_fps)}fps{args.input.suffix}")
+        # .apng is not a registered Pillow extension; animated PNG uses .png.
+        ext = {"gif": ".gif", "webp": ".webp", "apng": ".png"}[args.format]
+        out = args.input.with_name(f"{args.input.stem}_{int(args.dst_fps)}fps{ext}")
     else:
         out = args.output
 
-    src_n, dst_n = convert_gif_fps(args.input, out, dst_fps=args.dst_fps)
+    src_n, dst_n = convert_gif_fps(args.input, out, dst_fps=args.dst_fps, fmt=args.format)
     print(f"Wrote: {out} (frames {src_n} -> {dst_n}, {args.dst_fps} fps)")
     return 0
 
@@ -19,13 +19,36 @@ Outputs (by default):
 from __future__ import annotations
 
 import argparse
+import os
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Literal, Optional, Sequence, Tuple
 
+import imageio_ffmpeg
+import numpy as np
 from PIL import Image
 
+# Optional accelerators (see requirements.txt):
+# - OpenCV's INTER_LANCZOS4 resize is SIMD-vectorized and several times faster
+#   than stock Pillow's convolver (Pillow-SIMD offers the same win drop-in).
+# - simplejpeg decodes JPEGs through libjpeg-turbo, roughly 2x faster than
+#   Pillow's decoder, and hands back a NumPy array with no extra copy.
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+Engine = Literal["ffmpeg", "pillow"]
+
 
 @dataclass(frozen=True)
 class SequencePaths:
@@ -34,35 +57,51 @@ class SequencePaths:
     out_gif: Path
 
 
-def _numeric_stem(p: Path) -> int:
-    # Expected stems like "0", "1", "198"
-    return int(p.stem)
+def _ffmpeg_exe() -> str:
+    return imageio_ffmpeg.get_ffmpeg_exe()
 
 
-def _list_frames(directory: Path) -> List[Path]:
+@lru_cache(maxsize=None)
+def _list_frames(directory: Path) -> Tuple[Path, ...]:
+    # Cached so repeated build_gif calls on the same directory (e.g. retrying
+    # with different fps/scale in one process) don't re-walk it. os.scandir
+    # avoids the extra stat() per entry that iterdir + is_file() incurs.
     if not directory.exists():
         raise FileNotFoundError(f"Missing directory: {directory}")
 
-    frames = [p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in {".jpg", ".jpeg", ".png"}]
-    if not frames:
-        raise FileNotFoundError(f"No frames found in: {directory}")
-
+    # Build (numeric stem, path) pairs in one pass; sorting int-keyed tuples
+    # runs entirely in C, with no per-comparison key callback.
     try:
-        frames.sort(key=_numeric_stem)
+        with os.scandir(directory) as it:
+            entries = [
+                (int(e.name.split(".", 1)[0]), Path(e.path))
+                for e in it
+                if e.is_file() and e.name.lower().endswith((".jpg", ".jpeg", ".png"))
+            ]
     except ValueError as e:
         raise ValueError(
             f"Frame filenames must be numeric (e.g. 0.jpg, 1.jpg). " f"Found non-numeric in: {directory}"
         ) from e
-    return frames
+
+    if not entries:
+        raise FileNotFoundError(f"No frames found in: {directory}")
+
+    entries.sort()
+    return tuple(p for _, p in entries)
 
 
-def _validate_pairs(left_frames: List[Path], right_frames: List[Path], strict: bool) -> List[Tuple[Path, Path]]:
-    left_map = {p.stem: p for p in left_frames}
-    right_map = {p.stem: p for p in right_frames}
+def _validate_pairs(
+    left_frames: Sequence[Path], right_frames: Sequence[Path], strict: bool
+) -> List[Tuple[Path, Path]]:
+    # Key by the numeric index directly: one int() per stem, natural sort
+    # order for free, and dict key views intersect/difference without the
+    # extra set() copies.
+    left_map = {int(p.stem): p for p in left_frames}
+    right_map = {int(p.stem): p for p in right_frames}
 
-    common = sorted(set(left_map.keys()) & set(right_map.keys()), key=lambda s: int(s))
-    missing_left = sorted(set(right_map.keys()) - set(left_map.keys()), key=lambda s: int(s))
-    missing_right = sorted(set(left_map.keys()) - set(right_map.keys()), key=lambda s: int(s))
+    common = sorted(left_map.keys() & right_map.keys())
+    missing_left = sorted(right_map.keys() - left_map.keys())
+    missing_right = sorted(left_map.keys() - right_map.keys())
 
     if strict and (missing_left or missing_right):
         msg = ["Left/right frames do not match."]
@@ -78,37 +117,213 @@ def _validate_pairs(left_frames: List[Path], right_frames: List[Path], strict: b
     return pairs
 
 
-def _resize_to_match_height(img: Image.Image, target_h: int) -> Image.Image:
-    if img.height == target_h:
-        return img
-    new_w = max(1, round(img.width * (target_h / img.height)))
-    return img.resize((new_w, target_h), Image.Resampling.LANCZOS)
-
-
-def _maybe_scale(img: Image.Image, scale: float) -> Image.Image:
-    if scale == 1.0:
-        return img
-    new_w = max(1, round(img.width * scale))
-    new_h = max(1, round(img.height * scale))
-    return img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-
-def _stitch_lr(left: Image.Image, right: Image.Image, *, scale: float) -> Image.Image:
-    left = left.convert("RGB")
-    right = right.convert("RGB")
-
-    left = _maybe_scale(left, scale)
-    right = _maybe_scale(right, scale)
+def _load_rgb(path: Path) -> np.ndarray:
+    # uint8 HxWx3 array; simplejpeg (libjpeg-turbo) skips Pillow's lazy-decode
+    # and mode-conversion overhead and decodes straight into the array.
+    if simplejpeg is not None and path.suffix.lower() in {".jpg", ".jpeg"}:
+        return simplejpeg.decode_jpeg(path.read_bytes(), colorspace="RGB")
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def _resize_lanczos(arr: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    h, w = arr.shape[:2]
+    if (w, h) == size:
+        return arr
+    if cv2 is not None:
+        return cv2.resize(arr, size, interpolation=cv2.INTER_LANCZOS4)
+    return np.asarray(Image.fromarray(arr).resize(size, Image.Resampling.LANCZOS))
+
+
+def _stitch_lr(left: np.ndarray, right: np.ndarray, *, scale: float) -> np.ndarray:
+    # Fold the uniform scale and the height-matching step (heights usually
+    # already agree for dual-cam streams, but we keep it robust) into a single
+    # LANCZOS pass per side: half the convolution cost when scale != 1.0 and
+    # no compounded resampling error from resizing twice.
+    target_h = min(
+        max(1, round(left.shape[0] * scale)),
+        max(1, round(right.shape[0] * scale)),
+    )
 
-    # Make heights match (common for dual-cam streams, but we keep it robust).
-    target_h = min(left.height, right.height)
-    left = _resize_to_match_height(left, target_h)
-    right = _resize_to_match_height(right, target_h)
+    parts: List[np.ndarray] = []
+    for arr in (left, right):
+        h, w = arr.shape[:2]
+        new_w = max(1, round(w * target_h / h))
+        parts.append(_resize_lanczos(arr, (new_w, target_h)))
+
+    # Single contiguous memcpy into one uint8 tile; no Pillow paste/mode
+    # dispatch, and the result feeds tobytes()/fromarray with no extra copy.
+    return np.concatenate(parts, axis=1)
+
+
+def _encode_gif_rawpipe(frames: Iterable[bytes], size: Tuple[int, int], out_gif: Path, *, fps: float) -> None:
+    # Stream raw RGB frames into ffmpeg over stdin. A single global
+    # palettegen/paletteuse pass is both faster and smaller than Pillow's
+    # per-frame adaptive palette + LZW optimizer, with no temp files.
+    w, h = size
+    cmd: List[str] = [
+        _ffmpeg_exe(),
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        f"{w}x{h}",
+        "-framerate",
+        str(fps),
+        "-i",
+        "-",
+        "-filter_complex",
+        "split[a][b];[a]palettegen=stats_mode=diff[p];[b][p]paletteuse=dither=bayer",
+        "-loop",
+        "0",
+        str(out_gif),
+    ]
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        for raw in frames:
+            proc.stdin.write(raw)
+    finally:
+        proc.stdin.close()
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def _stitch_one(args: Tuple[Path, Path, float]) -> Tuple[int, int, bytes]:
+    # Worker for ProcessPoolExecutor: return raw RGB + size rather than a
+    # PIL.Image so the result pickles as one flat buffer.
+    left_path, right_path, scale = args
+    stitched = _stitch_lr(_load_rgb(left_path), _load_rgb(right_path), scale=scale)
+    h, w = stitched.shape[:2]
+    return w, h, stitched.tobytes()
+
+
+def _stitch_frames_cuda(
+    pairs: List[Tuple[Path, Path]], scale: float, batch: int = 32
+) -> "Iterable[Tuple[int, int, bytes]] | None":
+    """
+    GPU variant of the stitching stage: decode on CPU, batch-resize both
+    sides with torch's antialiased bicubic on CUDA (visually close to
+    LANCZOS), stitch in NumPy. Returns None when torch or a CUDA device is
+    unavailable so the caller can fall back to the process-pool CPU path.
+    """
+    try:
+        import torch
+        import torch.nn.functional as F
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+
+    def _resize_batch(arrs: List[np.ndarray], target_h: int) -> np.ndarray:
+        h, w = arrs[0].shape[:2]
+        new_w = max(1, round(w * target_h / h))
+        x = torch.from_numpy(np.stack(arrs)).cuda().permute(0, 3, 1, 2).float()
+        y = F.interpolate(x, size=(target_h, new_w), mode="bicubic", antialias=True)
+        return y.round_().clamp_(0, 255).to(torch.uint8).permute(0, 2, 3, 1).cpu().numpy()
+
+    def _gen() -> Iterable[Tuple[int, int, bytes]]:
+        for start in range(0, len(pairs), batch):
+            chunk = pairs[start : start + batch]
+            lefts = [_load_rgb(l) for l, _ in chunk]
+            rights = [_load_rgb(r) for _, r in chunk]
+
+            if len({a.shape for a in lefts}) > 1 or len({a.shape for a in rights}) > 1:
+                # Mixed sizes can't be batched into one tensor; stitch this
+                # chunk pair-by-pair on CPU instead.
+                for left, right in zip(lefts, rights):
+                    stitched = _stitch_lr(left, right, scale=scale)
+                    h, w = stitched.shape[:2]
+                    yield w, h, stitched.tobytes()
+                continue
+
+            target_h = min(
+                max(1, round(lefts[0].shape[0] * scale)),
+                max(1, round(rights[0].shape[0] * scale)),
+            )
+            stacked = np.concatenate(
+                [_resize_batch(lefts, target_h), _resize_batch(rights, target_h)], axis=2
+            )
+            h, w = stacked.shape[1:3]
+            for frame in stacked:
+                yield w, h, np.ascontiguousarray(frame).tobytes()
+
+    return _gen()
+
+
+def _is_contiguous_from_zero(pairs: List[Tuple[Path, Path]]) -> bool:
+    return all(int(left.stem) == i for i, (left, _) in enumerate(pairs))
+
+
+def _uniform_jpeg_suffix(frames: Sequence[Path]) -> Optional[str]:
+    # ffmpeg's image2 pattern is matched literally against filenames, so a
+    # directory only qualifies when every frame shares one exact suffix (a
+    # stray .jpeg or .JPG would make a %d.jpg input abort mid-sequence rather
+    # than fall back). Returns that suffix, or None to use the Pillow engine.
+    suffixes = {p.suffix for p in frames}
+    if len(suffixes) == 1:
+        suffix = next(iter(suffixes))
+        if suffix.lower() in {".jpg", ".jpeg"}:
+            return suffix
+    return None
+
+
+def _build_gif_ffmpeg(
+    pairs: List[Tuple[Path, Path]],
+    left_dir: Path,
+    right_dir: Path,
+    out_gif: Path,
+    *,
+    fps: float,
+    scale: float,
+    left_suffix: str = ".jpg",
+    right_suffix: str = ".jpg",
+) -> None:
+    # Opening the first pair is cheap (Pillow reads only the header for .size).
+    with Image.open(pairs[0][0]) as l_img, Image.open(pairs[0][1]) as r_img:
+        target_h = max(1, round(min(l_img.height, r_img.height) * scale))
+
+    # scale+hstack run in ffmpeg's SIMD filter graph; palettegen/paletteuse
+    # computes one global palette instead of Pillow's per-frame quantization.
+    vf = (
+        f"[0:v]scale=-2:{target_h}[l];"
+        f"[1:v]scale=-2:{target_h}[r];"
+        f"[l][r]hstack=inputs=2,split[a][b];"
+        f"[a]palettegen=stats_mode=diff[p];"
+        f"[b][p]paletteuse=dither=bayer"
+    )
 
-    out = Image.new("RGB", (left.width + right.width, target_h))
-    out.paste(left, (0, 0))
-    out.paste(right, (left.width, 0))
-    return out
+    cmd: List[str] = [
+        _ffmpeg_exe(),
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-framerate",
+        str(fps),
+        "-start_number",
+        "0",
+        "-i",
+        str(left_dir / f"%d{left_suffix}"),
+        "-framerate",
+        str(fps),
+        "-start_number",
+        "0",
+        "-i",
+        str(right_dir / f"%d{right_suffix}"),
+        "-filter_complex",
+        vf,
+        "-loop",
+        "0",
+        str(out_gif),
+    ]
+
+    subprocess.run(cmd, check=True)
 
 
 def build_gif(
@@ -119,30 +334,74 @@ def build_gif(
     fps: float,
     scale: float,
     strict: bool,
+    engine: Engine = "ffmpeg",
+    device: str = "auto",
 ) -> None:
     left_frames = _list_frames(left_dir)
     right_frames = _list_frames(right_dir)
     pairs = _validate_pairs(left_frames, right_frames, strict=strict)
 
-    duration_ms = max(1, int(round(1000.0 / fps)))
-
-    stitched_frames: List[Image.Image] = []
-    for left_path, right_path in pairs:
-        with Image.open(left_path) as l_img, Image.open(right_path) as r_img:
-            stitched = _stitch_lr(l_img, r_img, scale=scale)
-            stitched_frames.append(stitched)
-
     out_gif.parent.mkdir(parents=True, exist_ok=True)
-    first, rest = stitched_frames[0], stitched_frames[1:]
-    first.save(
-        out_gif,
-        save_all=True,
-        append_images=rest,
-        loop=0,
-        duration=duration_ms,
-        optimize=True,
-        disposal=2,
-    )
+
+    if engine == "ffmpeg":
+        # ffmpeg's %d-pattern demuxer needs a gap-free sequence starting at 0
+        # with one literal suffix per directory — and it reads each whole
+        # directory, so both listings must consist of exactly the paired
+        # frames (extra trailing frames on one side would freeze the shorter
+        # input instead of honoring the intersection). Fall back to the
+        # Pillow path for sparse/mismatched/mixed-suffix frame sets.
+        left_suffix = _uniform_jpeg_suffix(left_frames)
+        right_suffix = _uniform_jpeg_suffix(right_frames)
+        if (
+            left_suffix is not None
+            and right_suffix is not None
+            and len(pairs) == len(left_frames) == len(right_frames)
+            and _is_contiguous_from_zero(pairs)
+        ):
+            _build_gif_ffmpeg(
+                pairs,
+                left_dir,
+                right_dir,
+                out_gif,
+                fps=fps,
+                scale=scale,
+                left_suffix=left_suffix,
+                right_suffix=right_suffix,
+            )
+            return
+        print("  (frames not a contiguous 0..N uniform-JPEG sequence; using pillow engine)")
+
+    # Decode + resize is the hot cost and each pair is independent, so fan the
+    # stitching out — across cores via a process pool, or batched on a CUDA
+    # device when available — and stream raw frames straight into ffmpeg's
+    # GIF encoder. Only the frame being encoded is resident, never the whole
+    # O(N) stitched sequence.
+    def _cpu_results() -> Iterable[Tuple[int, int, bytes]]:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            yield from ex.map(_stitch_one, [(l, r, scale) for l, r in pairs], chunksize=8)
+
+    results = None
+    if device in ("auto", "cuda"):
+        results = _stitch_frames_cuda(pairs, scale)
+        if results is None and device == "cuda":
+            print("  (CUDA requested but torch/CUDA unavailable; using CPU)")
+    if results is None:
+        results = _cpu_results()
+
+    it = iter(results)
+    first_w, first_h, first_raw = next(it)
+
+    def frames() -> Iterable[bytes]:
+        yield first_raw
+        for w, h, raw in it:
+            if (w, h) != (first_w, first_h):
+                # rawvideo input needs a constant frame size; conform any
+                # stragglers to the first frame.
+                arr = np.frombuffer(raw, dtype=np.uint8).reshape(h, w, 3)
+                raw = np.ascontiguousarray(_resize_lanczos(arr, (first_w, first_h))).tobytes()
+            yield raw
+
+    _encode_gif_rawpipe(frames(), (first_w, first_h), out_gif, fps=fps)
 
 
 def _guess_sequence_paths(repo_root: Path) -> List[SequencePaths]:
@@ -184,6 +443,18 @@ def main(argv: Iterable[str]) -> int:
         action="store_true",
         help="If set, build GIF using only the intersection of left/right frame indices.",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["ffmpeg", "pillow"],
+        default="ffmpeg",
+        help="ffmpeg = stream frames through ffmpeg's filter graph (fast); pillow = stitch in Python (default: ffmpeg).",
+    )
+    parser.add_argument(
+        "--device",
+        choices=["auto", "cpu", "cuda"],
+        default="auto",
+        help="Resize device for the pillow engine; auto uses CUDA via torch when present (default: auto).",
+    )
     args = parser.parse_args(list(argv))
 
     if args.fps <= 0:
@@ -200,7 +471,16 @@ def main(argv: Iterable[str]) -> int:
         print(f"Building {seq.out_gif} from:")
         print(f"  left:  {seq.left_dir}")
         print(f"  right: {seq.right_dir}")
-        build_gif(seq.left_dir, seq.right_dir, seq.out_gif, fps=args.fps, scale=args.scale, strict=strict)
+        build_gif(
+            seq.left_dir,
+            seq.right_dir,
+            seq.out_gif,
+            fps=args.fps,
+            scale=args.scale,
+            strict=strict,
+            engine=args.engine,
+            device=args.device,
+        )
         print("  done")
 
     return 0
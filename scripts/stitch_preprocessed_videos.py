@@ -14,8 +14,10 @@ This uses ffmpeg via imageio-ffmpeg so you don't need ffmpeg installed globally.
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Literal, Optional
 
@@ -26,6 +28,61 @@ def _ffmpeg_exe() -> str:
     return imageio_ffmpeg.get_ffmpeg_exe()
 
 
+# Hardware H.264 encoders in preference order for --hwaccel auto.
+_HW_ENCODERS = {
+    "nvenc": "h264_nvenc",
+    "qsv": "h264_qsv",
+    "vt": "h264_videotoolbox",
+}
+
+
+@lru_cache(maxsize=None)
+def _encoder_works(encoder: str) -> bool:
+    # Static ffmpeg builds list hardware encoders even when no usable device
+    # is present, so probe by actually encoding one tiny test frame.
+    cmd = [
+        _ffmpeg_exe(),
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        "color=black:s=64x64:d=0.1",
+        "-frames:v",
+        "1",
+        "-c:v",
+        encoder,
+        "-f",
+        "null",
+        "-",
+    ]
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+def _pick_encoder(hwaccel: str) -> str:
+    if hwaccel == "none":
+        return "libx264"
+    if hwaccel in _HW_ENCODERS:
+        return _HW_ENCODERS[hwaccel]
+    for encoder in _HW_ENCODERS.values():
+        if _encoder_works(encoder):
+            return encoder
+    return "libx264"
+
+
+def _quality_args(encoder: str, crf: int) -> List[str]:
+    # Map the crf knob onto each encoder's native quality control.
+    if encoder == "h264_nvenc":
+        return ["-preset", "slow", "-cq", str(crf)]
+    if encoder == "h264_qsv":
+        return ["-preset", "slow", "-global_quality", str(crf)]
+    if encoder == "h264_videotoolbox":
+        # videotoolbox has no crf; -q:v is 1..100 with higher = better.
+        return ["-q:v", str(max(1, min(100, 100 - 2 * crf)))]
+    return ["-preset", "slow", "-crf", str(crf)]
+
+
 def _require_dir(p: Path) -> None:
     if not p.exists() or not p.is_dir():
         raise FileNotFoundError(f"Missing directory: {p}")
@@ -44,6 +101,8 @@ def stitch_dataset(
     mode: Mode,
     perspective: Optional[Perspective],
     crf: int,
+    cache: bool = False,
+    encoder: str = "libx264",
 ) -> Path:
     assets = repo_root / "assets"
     base = assets / "pre-processed image folders" / dataset
@@ -78,40 +137,50 @@ def stitch_dataset(
         idx = 1 if use_right else 0
         vf = f"[{idx}:v]scale=-2:{height}"
 
-    cmd: List[str] = [
-        _ffmpeg_exe(),
-        "-y",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-framerate",
-        str(fps),
-        "-start_number",
-        "0",
-        "-i",
-        left_pattern,
-        "-framerate",
-        str(fps),
-        "-start_number",
-        "0",
-        "-i",
-        right_pattern,
-        "-filter_complex",
-        vf,
-        "-r",
-        str(fps),
-        "-c:v",
-        "libx264",
-        "-pix_fmt",
-        "yuv420p",
-        "-crf",
-        str(crf),
-        "-preset",
-        "slow",
-        str(out_path),
-    ]
+    # The image2 demuxer decodes JPEGs single-threaded per input by default;
+    # spread decode and the scale/hstack graph across all cores. genpts +
+    # a minimal probesize skip auto-probing the sequence (the pattern already
+    # pins the format). libx264 at -preset slow remains the bottleneck; see
+    # --hwaccel for faster preview encodes.
+    threads = str(os.cpu_count() or 1)
+    common: List[str] = [_ffmpeg_exe(), "-y", "-hide_banner", "-loglevel", "error"]
+    per_input: List[str] = ["-threads", threads, "-fflags", "+genpts", "-probesize", "32"]
+    inputs: List[str] = (
+        per_input
+        + ["-framerate", str(fps), "-start_number", "0", "-i", left_pattern]
+        + per_input
+        + ["-framerate", str(fps), "-start_number", "0", "-i", right_pattern]
+    )
+    filter_args: List[str] = ["-filter_complex_threads", threads, "-filter_complex", vf]
+    encode: List[str] = (
+        ["-r", str(fps), "-c:v", encoder, "-pix_fmt", "yuv420p"] + _quality_args(encoder, crf) + [str(out_path)]
+    )
 
-    subprocess.run(cmd, check=True)
+    if cache:
+        # Stage the decoded+filtered frames as raw YUV once, keyed by the
+        # output name (dataset/height/fps/perspective — everything but crf).
+        # Re-runs that only change encode params skip the JPEG decode and
+        # filter graph entirely and are bound by x264 alone. Raw y4m is big
+        # (~0.5 MB per 480p frame), hence opt-in via --cache.
+        cache_path = out_path.with_suffix(".y4m")
+        if not cache_path.exists():
+            # Stage into a temp name and rename into place only on success —
+            # an interrupted run must not leave a truncated file under the
+            # cache name, where the bare exists() check would trust it and
+            # silently encode a short video on every later run.
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            try:
+                subprocess.run(
+                    common + inputs + filter_args + ["-pix_fmt", "yuv420p", "-f", "yuv4mpegpipe", str(tmp_path)],
+                    check=True,
+                )
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            tmp_path.replace(cache_path)
+        subprocess.run(common + ["-i", str(cache_path)] + encode, check=True)
+    else:
+        subprocess.run(common + inputs + filter_args + encode, check=True)
     return out_path
 
 
@@ -144,6 +213,18 @@ def main(argv: Iterable[str]) -> int:
         help="When --mode single, choose which channel to export (default: left).",
     )
     parser.add_argument("--crf", type=int, default=28, help="H.264 quality (lower=better, default: 28).")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep a raw .y4m intermediate next to the output so re-runs with different --crf skip JPEG decode.",
+    )
+    parser.add_argument(
+        "--hwaccel",
+        choices=["auto", "none", "nvenc", "qsv", "vt"],
+        default="none",
+        help="Hardware H.264 encoder for faster preview encodes; auto probes "
+        "nvenc/qsv/videotoolbox (default: none = libx264, best quality stability).",
+    )
     args = parser.parse_args(list(argv))
 
     if args.fps <= 0:
@@ -156,6 +237,10 @@ def main(argv: Iterable[str]) -> int:
         print("--crf must be between 0 and 51", file=sys.stderr)
         return 2
 
+    encoder = _pick_encoder(args.hwaccel)
+    if args.hwaccel != "none":
+        print(f"Using encoder: {encoder}")
+
     for d in args.datasets:
         print(f"Stitching dataset {d} ...")
         out = stitch_dataset(
@@ -166,6 +251,8 @@ def main(argv: Iterable[str]) -> int:
             mode=args.mode,
             perspective=args.perspective if args.mode == "single" else None,
             crf=args.crf,
+            cache=args.cache,
+            encoder=encoder,
         )
         print(f"  wrote: {out}")
 